@@ -46,16 +46,16 @@ __all__ = [
 ]
 
 
-def _maybe_load(data: Any) -> Any:
+def _maybe_load(data: Any, max_items: int) -> Any:
     """If *data* is a path, load it; otherwise return as-is."""
     if isinstance(data, Path):
-        return load_path(data)
+        return load_path(data, max_items=max_items)
     if isinstance(data, str):
         if len(data) > _MAX_PATH_LEN or "\n" in data:
             return data
         p = Path(data)
         if p.is_file():
-            return load_path(p)
+            return load_path(p, max_items=max_items)
     return data
 
 
@@ -70,13 +70,13 @@ def schema_of(
     ----------
     data:
         The object to inspect.  Accepts ``dict``, ``list``, ``tuple``,
-        ``set``, ``frozenset``, a file path (``str`` or
+        ``range``, ``set``, ``frozenset``, a file path (``str`` or
         ``pathlib.Path`` to a ``.json`` file), or any value with a
         recognisable type.
     max_items:
         Maximum number of list elements sampled for type inference.
     """
-    data = _maybe_load(data)
+    data = _maybe_load(data, max_items)
     tree = infer_schema(data, max_items=max_items)
     return render(tree)
 
@@ -92,7 +92,7 @@ def preview(
     ----------
     data:
         The object to inspect.  Accepts ``dict``, ``list``, ``tuple``,
-        ``set``, ``frozenset``, a file path (``str`` or
+        ``range``, ``set``, ``frozenset``, a file path (``str`` or
         ``pathlib.Path`` to a ``.json`` file), or any value with a
         recognisable type.
     max_items:
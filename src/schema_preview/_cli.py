@@ -12,12 +12,11 @@ Usage::
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 from pathlib import Path
 from typing import Any
 
-from ._loader import load_jsonl, load_path
+from ._loader import load_json, load_jsonl, load_path
 from ._schema import infer_schema
 from ._tree import render
 
@@ -59,18 +58,20 @@ def main() -> None:
     """Entry-point wired to the ``schema-preview`` console script."""
     parser = _build_parser()
     args = parser.parse_args()
+    if args.max_items < 0:
+        parser.error("--max-items must be >= 0")
 
     data: Any
     if args.file is not None:
-        data = load_path(Path(args.file))
+        data = load_path(Path(args.file), max_items=args.max_items)
     else:
         if sys.stdin.isatty():
             parser.print_help()
             sys.exit(1)
         if args.jsonl:
-            data = load_jsonl(sys.stdin)
+            data = load_jsonl(sys.stdin, args.max_items)
         else:
-            data = json.load(sys.stdin)
+            data = load_json(sys.stdin)
 
     tree = infer_schema(data, max_items=args.max_items)
     print(render(tree))
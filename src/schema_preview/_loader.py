@@ -4,44 +4,88 @@ Centralises all file I/O so that both the Python API
 (``__init__.py``) and the CLI (``_cli.py``) share a single
 code path for validation and parsing.
 
+Decoding uses ``orjson`` when it happens to be installed (it is several
+times faster than the stdlib), and the stdlib ``json`` module otherwise.
+
 Usage::
 
     from ._loader import load_path, load_jsonl
 
     data = load_path(Path("data.json"))
+    data = load_json(sys.stdin)
     data = load_jsonl(sys.stdin)
+
+    # Only parse as many JSONL records as inference will sample:
+    data = load_path(Path("data.jsonl"), max_items=10)
 """
 
 from __future__ import annotations
 
 import json
+from itertools import islice
 from pathlib import Path
 from typing import IO, Any
 
+try:
+    import orjson as _orjson
+except ImportError:  # optional speed-up, not a dependency
+    _orjson = None  # type: ignore[assignment, unused-ignore]
+
 # File extensions accepted by load_path().
 _SUPPORTED_SUFFIXES = {".json", ".jsonl"}
 
 
-def load_jsonl(f: IO[str]) -> list[Any]:
-    """Parse a JSONL stream (one JSON object per line)."""
-    return [json.loads(line) for line in f if line.strip()]
+def _loads(text: str) -> Any:
+    """Decode one JSON document, preferring orjson when available."""
+    if _orjson is not None:
+        try:
+            return _orjson.loads(text)
+        except ValueError:
+            # orjson rejects some input the stdlib accepts (NaN, integers
+            # wider than 64 bits); let json decide, and raise, as before.
+            pass
+    return json.loads(text)
+
+
+def load_json(f: IO[str]) -> Any:
+    """Parse a single JSON document from a text stream."""
+    return _loads(f.read())
+
+
+def load_jsonl(f: IO[str], max_items: int | None = None) -> list[Any]:
+    """Parse a JSONL stream (one JSON object per line).
+
+    Lines are read lazily; with *max_items* set, reading stops after that
+    many records, so the rest of the stream is never loaded.
+    """
+    records = (_loads(line) for line in f if line.strip())
+    return list(islice(records, max_items))
 
 
-def load_path(path: Path) -> Any:
+def load_path(path: Path, *, max_items: int | None = None) -> Any:
     """Read and parse a JSON or JSONL file from *path*.
 
     Parameters
     ----------
     path:
         Must point to an existing ``.json`` or ``.jsonl`` file.
+    max_items:
+        For ``.jsonl`` files, the maximum number of records to parse.
+        Inference only samples the first *max_items* elements of the
+        top-level list, so later records can be skipped entirely.
+        ``None`` loads every record.  Ignored for ``.json`` files.
 
     Raises
     ------
     FileNotFoundError
         If *path* does not exist.
     ValueError
-        If *path* has an unsupported extension.
+        If *max_items* is negative, or *path* has an unsupported
+        extension.
     """
+    # Checked before reading so a bad sample size never costs a file load.
+    if max_items is not None and max_items < 0:
+        raise ValueError(f"max_items must be >= 0, got {max_items}")
     if not path.is_file():
         raise FileNotFoundError(f"File not found: {path}")
     suffix = path.suffix.lower()
@@ -52,5 +96,5 @@ def load_path(path: Path) -> Any:
         )
     with open(path, encoding="utf-8") as f:
         if suffix == ".jsonl":
-            return load_jsonl(f)
-        return json.load(f)
+            return load_jsonl(f, max_items)
+        return load_json(f)
@@ -0,0 +1,33 @@
+"""Warning reporting for the inference engine.
+
+Kept out of ``_schema.py`` on purpose: it must stay pure Python even when
+``_schema.py`` is compiled with mypyc.  ``warnings.warn`` attributes a
+warning by walking interpreter frames, and compiled functions have none,
+so the call has to come from a real frame inside the package for
+``skip_file_prefixes`` to land on the caller's code.
+"""
+
+from __future__ import annotations
+
+import os
+import warnings
+
+# How many mixed-type messages the summary warning quotes.
+_MAX_WARNING_MESSAGES = 5
+
+# Frames under this directory are skipped when attributing warnings.
+_PACKAGE_DIR = os.path.dirname(__file__) + os.sep
+
+
+def warn_mixed(messages: list[str]) -> None:
+    """Emit one warning covering every mixed-type list found."""
+    if len(messages) == 1:
+        text = messages[0]
+    else:
+        shown = "; ".join(messages[:_MAX_WARNING_MESSAGES])
+        text = f"{len(messages)} lists with mixed types: {shown}"
+        hidden = len(messages) - _MAX_WARNING_MESSAGES
+        if hidden > 0:
+            text += f"; and {hidden} more"
+    # Point the warning at the first caller outside this package.
+    warnings.warn(text, skip_file_prefixes=(_PACKAGE_DIR,))
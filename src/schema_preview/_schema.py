@@ -5,21 +5,33 @@ The tree captures:
   - key name
   - inferred type(s)
   - children (for dicts / lists-of-dicts)
-  - warnings (e.g. mixed types inside a list)
+  - warnings (e.g. mixed types inside a list), reported as a single
+    ``warnings.warn`` call per inference
 
 Performance: list/tuple/set are only sampled up to `max_items` elements
-(default 10) to keep inference fast on large payloads.
+(default 10) to keep inference fast on large payloads.  The input is
+walked iteratively with an explicit stack rather than by recursion, so
+deeply nested documents never hit the interpreter's recursion limit.
+The containers currently being expanded are tracked in one mutable map,
+so self-referential input is rejected with ``ValueError`` instead of
+looping forever.
+
+The module is fully typed and mypyc-compatible; compiling it in place
+(see AGENTS.md) makes the hot inference loop several times faster, and
+the pure-Python source is used whenever no compiled module is present.
 """
 
 from __future__ import annotations
 
-import warnings
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
-from itertools import islice
+from itertools import chain, islice
 from typing import Any
 
+from ._report import warn_mixed
 
-@dataclass
+
+@dataclass(slots=True)
 class SchemaNode:
     """One node in the inferred schema tree."""
 
@@ -33,6 +45,54 @@ class SchemaNode:
     element_type: str | None = None
 
 
+# Container types whose elements are sampled for inference.
+_SEQUENCE_TYPES = (list, tuple, set, frozenset, range)
+
+# type -> type name.  ``type.__name__`` builds a new string on every call
+# for built-in types, so names are cached; seeded with the JSON types.
+_TYPE_NAME_CACHE: dict[type, str] = {
+    t: t.__name__
+    for t in (
+        dict,
+        list,
+        str,
+        int,
+        float,
+        bool,
+        type(None),
+        tuple,
+        set,
+        frozenset,
+        range,
+    )
+}
+
+# A pending unit of work: (handler, node to fill in, value to inspect,
+# the source containers being expanded, or None when that is the value
+# itself).  Handlers populate the node and push follow-up work for nested
+# containers instead of recursing.  Mixed-type messages are collected in
+# a list and reported once, since warnings.warn() is slow.
+_Work = tuple["_Handler | None", SchemaNode, Any, Sequence[Any] | None]
+_Handler = Callable[[SchemaNode, Any, "list[_Work]", int, list[str]], None]
+
+# Pushed below a work item's follow-up work: popping it means the item's
+# whole subtree is done.
+_END: _Work = (None, SchemaNode(key="", types=[]), None, None)
+
+
+@dataclass(slots=True)
+class _Active:
+    """The work items whose subtrees are currently being expanded."""
+
+    # Innermost last.  Each value's real ancestors are one source from
+    # each of these items.
+    stack: list[_Work] = field(default_factory=list)
+    # id -> number of stacked items with that source: a constant-time
+    # filter, since merged records share one item and so over-approximate
+    # any single value's ancestors.
+    counts: dict[int, int] = field(default_factory=dict)
+
+
 def infer_schema(
     data: Any,
     *,
@@ -50,12 +110,49 @@ def infer_schema(
     max_items:
         How many elements of a list / tuple / set to inspect before
         stopping.  Keeps inference O(1) for huge arrays.
+
+    Raises
+    ------
+    ValueError
+        If *max_items* is negative, or if *data* contains itself, e.g.
+        ``d = {}; d["self"] = d``.
+
+    Warns
+    -----
+    UserWarning
+        Once per call if any sampled list mixes element types.  The
+        message names the offending key, or summarises all of them when
+        there are several.
     """
-    if isinstance(data, dict):
-        return _infer_dict(data, key=key, max_items=max_items)
-    if isinstance(data, (list, tuple, set, frozenset)):
-        return _infer_sequence(data, key=key, max_items=max_items)
-    return SchemaNode(key=key, types=[_type_name(data)])
+    if max_items < 0:
+        raise ValueError(f"max_items must be >= 0, got {max_items}")
+    work: list[_Work] = []
+    active = _Active()
+    root = _new_node(key, data, work)
+    mixed: list[str] = []
+    while work:
+        item = work.pop()
+        handler, node, value, _ = item
+        if handler is None:
+            _leave(active)
+            continue
+        start = len(work)
+        handler(node, value, work, max_items, mixed)
+        pushed = len(work) - start
+        if not pushed:
+            continue
+        # Only items with follow-up work are tracked, so leaves cost
+        # nothing; the new work is checked against the enclosing items.
+        _expand(item, work, start, active)
+        if pushed == 1:
+            work.insert(start, _END)
+        else:
+            # Pop the new work in document order, then the end marker.
+            work[start:] = [_END, *reversed(work[start:])]
+
+    if mixed:
+        warn_mixed(mixed)
+    return root
 
 
 # ------------------------------------------------------------------
@@ -63,184 +160,257 @@ def infer_schema(
 # ------------------------------------------------------------------
 
 
-def _type_name(value: Any) -> str:
-    """Return the type name of *value* as a string."""
-    return type(value).__name__
+def _type_name(t: type) -> str:
+    """Return the (cached) name of type *t*."""
+    name = _TYPE_NAME_CACHE.get(t)
+    if name is None:
+        name = _TYPE_NAME_CACHE.setdefault(t, t.__name__)
+    return name
+
+
+def _sources(item: _Work) -> Sequence[Any]:
+    """Return the containers expanded by work *item*."""
+    _, _, value, sources = item
+    return (value,) if sources is None else sources
+
+
+def _expand(
+    item: _Work, work: list[_Work], start: int, active: _Active
+) -> None:
+    """Mark *item* as being expanded and check the work it queued.
+
+    Raises if work queued from *start* would re-expand one of its own
+    enclosing containers.  The same object may still appear any number of
+    times in sibling positions, or both beside and inside another record.
+    """
+    counts = active.counts
+    for source in _sources(item):
+        i = id(source)
+        counts[i] = counts.get(i, 0) + 1
+    active.stack.append(item)
+    for j in range(start, len(work)):
+        queued = work[j]
+        for source in _sources(queued):
+            if id(source) in counts and _encloses_itself(source, active):
+                raise _cycle_error(queued[1].key)
+
+
+def _leave(active: _Active) -> None:
+    """Undo _expand() for the innermost item once its subtree is done."""
+    counts = active.counts
+    for source in _sources(active.stack.pop()):
+        i = id(source)
+        count = counts[i]
+        if count == 1:
+            del counts[i]
+        else:
+            counts[i] = count - 1
+
+
+def _holds(container: Any, value: Any) -> bool:
+    """Return whether *value* is directly inside *container*."""
+    items = container.values() if isinstance(container, dict) else container
+    return any(item is value for item in items)
+
+
+def _encloses_itself(value: Any, active: _Active) -> bool:
+    """Return whether *value* is one of its own enclosing containers.
+
+    Walks outwards from the innermost expanded item, keeping at each level
+    only the sources that actually hold the previous level's containers,
+    so an object that merely sits beside its copy in a sibling record is
+    not mistaken for its own ancestor.
+    """
+    current = [value]
+    for item in reversed(active.stack):
+        current = [
+            source
+            for source in _sources(item)
+            if any(_holds(source, c) for c in current)
+        ]
+        if any(source is value for source in current):
+            return True
+    return False
+
+
+def _cycle_error(key: str) -> ValueError:
+    """Return the error raised for a container that encloses itself."""
+    return ValueError(
+        f"Key '{key}': cannot infer the schema of self-referential data"
+    )
+
+
+def _new_node(key: str, value: Any, work: list[_Work]) -> SchemaNode:
+    """Create the node for *value*, queueing containers for inspection."""
+    # Exact-type checks first: JSON values are always built-in types, and
+    # an identity compare is cheaper than isinstance().  Subclasses fall
+    # through to the isinstance() checks below.
+    t = type(value)
+    if t is dict:
+        node = SchemaNode(key=key, types=["dict"])
+        work.append((_infer_dict, node, value, None))
+        return node
+    node = SchemaNode(key=key, types=[_type_name(t)])
+    if (
+        t is list
+        or t is tuple
+        or t is set
+        or t is frozenset
+        or t is range
+    ):
+        work.append((_infer_sequence, node, value, None))
+    elif isinstance(value, dict):
+        node.types = ["dict"]
+        work.append((_infer_dict, node, value, None))
+    elif isinstance(value, _SEQUENCE_TYPES):
+        work.append((_infer_sequence, node, value, None))
+    return node
 
 
 def _infer_dict(
+    node: SchemaNode,
     data: dict[str, Any],
-    *,
-    key: str,
+    work: list[_Work],
     max_items: int,
-) -> SchemaNode:
+    mixed: list[str],
+) -> None:
     """Infer schema for a single dict."""
-    children = [
-        infer_schema(v, key=k, max_items=max_items) for k, v in data.items()
-    ]
-    return SchemaNode(key=key, types=["dict"], children=children)
+    node.children = [_new_node(k, v, work) for k, v in data.items()]
 
 
 def _infer_sequence(
-    data: list[Any] | tuple[Any, ...] | set[Any] | frozenset[Any],
-    *,
-    key: str,
+    node: SchemaNode,
+    data: list[Any] | tuple[Any, ...] | range | set[Any] | frozenset[Any],
+    work: list[_Work],
     max_items: int,
-) -> SchemaNode:
+    mixed: list[str],
+) -> None:
     """Infer schema for a list-like container.
 
     Strategy
     --------
-    1. Sample up to *max_items* elements.
-    2. Collect all distinct type names.
-    3. If **all** sampled elements are dicts → merge keys and recurse
+    1. Lists / tuples whose first *max_items* elements share one
+       primitive type → ``list[<type>]``, checked by indexing the
+       container without building a sample.
+    2. Otherwise sample up to *max_items* elements (a slice for lists /
+       tuples).
+    3. Scan for a single shared type by identity; the set of distinct
+       type names is only built when that scan fails.
+    4. If **all** sampled elements are dicts → merge keys and recurse
        (the node becomes ``list[dict]`` with merged children).
-    4. If all elements share one primitive type → ``list[<type>]``.
-    5. Mixed types → emit a warning and fall back to ``list``.
+    5. If all elements share one primitive type → ``list[<type>]``.
+    6. Mixed types → record a warning message and fall back to ``list``.
+
+    The node's container type (``list``, ``tuple``, …) is set by the
+    caller; only ``element_type`` and ``children`` are filled in here.
     """
-    container_type = _type_name(data)  # "list", "tuple", "set", …
-    sampled: list[Any] = list(islice(data, max_items))
+    # Lists, tuples and ranges are sliced in C (or used as-is when short
+    # enough); only sets need the iterator protocol.
+    sampled: Sequence[Any]
+    if type(data) is list or type(data) is tuple or type(data) is range:
+        # Fast path: a uniform primitive list / tuple / range is detected
+        # by indexing the container, so the common case builds no sample.
+        if max_items > 0 and data and type(data[0]) is not dict:
+            first_t = type(data[0])
+            for i in range(1, min(max_items, len(data))):
+                if type(data[i]) is not first_t:
+                    break
+            else:
+                node.element_type = _type_name(first_t)
+                return
+        sampled = data if len(data) <= max_items else data[:max_items]
+    else:
+        sampled = list(islice(data, max_items))
 
     if not sampled:
-        return SchemaNode(key=key, types=[container_type])
-
-    type_names: set[str] = {_type_name(v) for v in sampled}
-
-    # --- all dicts → merge --------------------------------------------------
-    if type_names == {"dict"}:
-        children = _merge_dict_schemas(sampled, max_items=max_items)
-        return SchemaNode(
-            key=key,
-            types=[container_type],
-            children=children,
-            element_type="dict",
-        )
+        return
+
+    # --- single type: one identity scan, no set of names needed -------------
+    first_t = type(sampled[0])
+    for v in sampled:
+        if type(v) is not first_t:
+            break
+    else:
+        # All dicts → merge keys; otherwise → list[<type>].
+        if first_t is dict:
+            node.element_type = "dict"
+            work.append((_merge_dict_schemas, node, sampled, sampled))
+        else:
+            node.element_type = _type_name(first_t)
+        return
 
-    # --- single primitive type ----------------------------------------------
+    # Distinct classes may still share a name; only differing names count
+    # as mixed.
+    type_names: set[str] = {_type_name(type(v)) for v in sampled}
     if len(type_names) == 1:
-        (element_type,) = type_names
-        return SchemaNode(
-            key=key,
-            types=[container_type],
-            element_type=element_type,
-        )
+        (node.element_type,) = type_names
+        return
 
     # --- mixed types --------------------------------------------------------
-    warnings.warn(
-        f"Key '{key}': mixed types in list: {sorted(type_names)}",
-        stacklevel=2,
+    mixed.append(
+        f"Key '{node.key}': mixed types in list: {sorted(type_names)}"
     )
-    return SchemaNode(key=key, types=[container_type])
-
-
-def _merge_all_dicts(
-    key: str,
-    values: list[Any],
-    *,
-    max_items: int,
-) -> SchemaNode:
-    """All values for *key* are dicts -> recurse deeper."""
-    merged = _merge_dict_schemas(values, max_items=max_items)
-    return SchemaNode(key=key, types=["dict"], children=merged)
 
 
-def _merge_all_lists(
-    key: str,
-    values: list[Any],
-    *,
-    max_items: int,
-) -> SchemaNode:
-    """All values for *key* are lists -> flatten and recurse."""
-    flat = [item for lst in values if isinstance(lst, list) for item in lst]
-    return _infer_sequence(flat, key=key, max_items=max_items)
-
+def _collect_values(dicts: Sequence[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Map each key to all values seen for it, in first-seen key order."""
+    # Fast path: when every dict has the same key layout (the usual case
+    # for homogeneous records) transpose the values column-wise in C.
+    keys = tuple(dicts[0]) if dicts else ()
+    for d in dicts:
+        if tuple(d) != keys:
+            break
+    else:
+        columns = zip(*[d.values() for d in dicts])
+        return dict(zip(keys, map(list, columns)))
 
-def _merge_nullable_dict(
-    key: str,
-    types: list[str],
-    values: list[Any],
-    *,
-    max_items: int,
-) -> SchemaNode | None:
-    """Handle {NoneType, dict} -> recurse into non-None dicts."""
-    dict_vals = [v for v in values if isinstance(v, dict)]
-    if not dict_vals:
-        return None
-    merged = _merge_dict_schemas(dict_vals, max_items=max_items)
-    return SchemaNode(key=key, types=types, children=merged)
-
-
-def _merge_nullable_list(
-    key: str,
-    types: list[str],
-    values: list[Any],
-    *,
-    max_items: int,
-) -> SchemaNode | None:
-    """Handle {NoneType, list} -> recurse into non-None lists."""
-    flat = [item for v in values if isinstance(v, list) for item in v]
-    if not flat:
-        return None
-    node = _infer_sequence(flat, key=key, max_items=max_items)
-    node.types = types  # preserve nullable annotation
-    return node
+    merged: dict[str, list[Any]] = {}
+    for d in dicts:
+        for k, v in d.items():
+            entry = merged.get(k)
+            if entry is None:
+                entry = merged[k] = []
+            entry.append(v)
+    return merged
 
 
 def _merge_dict_schemas(
-    dicts: list[dict[str, Any]],
-    *,
+    node: SchemaNode,
+    dicts: Sequence[dict[str, Any]],
+    work: list[_Work],
     max_items: int,
-) -> list[SchemaNode]:
+    mixed: list[str],
+) -> None:
     """Merge keys across many dicts, tracking per-key type sets."""
-
-    # Ordered set of all keys seen (preserves first-seen order).
-    all_keys: dict[str, None] = {}
-    # key -> list of types seen
-    key_types: dict[str, list[str]] = {}
-    # key -> list of all values (used for recursion into dicts/lists)
-    key_values: dict[str, list[Any]] = {}
-
-    for d in dicts:
-        for k, v in d.items():
-            all_keys.setdefault(k, None)
-            key_types.setdefault(k, []).append(_type_name(v))
-            key_values.setdefault(k, []).append(v)
-
     children: list[SchemaNode] = []
-    for k in all_keys:
-        distinct = sorted(set(key_types[k]))
-        distinct_set = set(distinct)
+    for k, values in _collect_values(dicts).items():
+        distinct = {_type_name(type(v)) for v in values}
+        # Only unions need sorting; most keys have a single type.
+        types = sorted(distinct) if len(distinct) > 1 else list(distinct)
+        child = SchemaNode(key=k, types=types)
+        children.append(child)
 
         # --- all dicts -> recurse deeper --------------------------------
-        if distinct == ["dict"]:
-            children.append(
-                _merge_all_dicts(k, key_values[k], max_items=max_items)
-            )
+        if distinct == {"dict"}:
+            work.append((_merge_dict_schemas, child, values, values))
         # --- all lists -> flatten and recurse ---------------------------
-        elif distinct == ["list"]:
-            children.append(
-                _merge_all_lists(k, key_values[k], max_items=max_items)
-            )
+        elif distinct == {"list"}:
+            # Only the first max_items elements would be sampled, so never
+            # materialise the full concatenation.
+            flat = list(islice(chain.from_iterable(values), max_items))
+            work.append((_infer_sequence, child, flat, values))
         # --- nullable dict {NoneType, dict} -----------------------------
-        elif distinct_set == {"NoneType", "dict"}:
-            node = _merge_nullable_dict(
-                k, distinct, key_values[k], max_items=max_items
-            )
-            if node is not None:
-                children.append(node)
-            else:
-                children.append(SchemaNode(key=k, types=distinct))
+        elif distinct == {"NoneType", "dict"}:
+            dict_vals = [v for v in values if type(v) is dict]
+            work.append((_merge_dict_schemas, child, dict_vals, dict_vals))
         # --- nullable list {NoneType, list} -----------------------------
-        elif distinct_set == {"NoneType", "list"}:
-            node = _merge_nullable_list(
-                k, distinct, key_values[k], max_items=max_items
-            )
-            if node is not None:
-                children.append(node)
-            else:
-                children.append(SchemaNode(key=k, types=distinct))
-        # --- fallback: mixed or primitive types -------------------------
-        else:
-            children.append(SchemaNode(key=k, types=distinct))
-
-    return children
+        elif distinct == {"NoneType", "list"}:
+            # The child keeps its nullable annotation; only the element
+            # type / children come from the non-None lists.
+            lists = [v for v in values if type(v) is list]
+            flat = list(islice(chain.from_iterable(lists), max_items))
+            if flat:
+                work.append((_infer_sequence, child, flat, lists))
+        # --- mixed or primitive types: nothing left to expand -----------
+
+    node.children = children
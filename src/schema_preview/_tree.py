@@ -33,30 +33,61 @@ _PIPE = "│   "
 _SPACE = "    "
 
 # Sequence type names that support ``type[element]`` formatting.
-_SEQUENCE_TYPES = {"list", "tuple", "set", "frozenset"}
+_SEQUENCE_TYPES = {"list", "tuple", "set", "frozenset", "range"}
 
 
 def render(node: SchemaNode) -> str:
-    """Return a multi-line Unicode tree string for *node*."""
+    """Return a multi-line Unicode tree string for *node*.
+
+    The tree is walked iteratively with an explicit stack, so deeply
+    nested schemas never hit the recursion limit.
+    """
     lines: list[str] = []
-    _render_node(node, lines, prefix="")
+    # Each entry: (node, line prefix incl. connector, prefix for children)
+    stack: list[tuple[SchemaNode, str, str]] = [(node, "", "")]
+    # Local aliases keep the per-node lookups in the loop below LOAD_FAST.
+    push = stack.append
+    push_line = lines.append
+    format_type = _format_type
+    # prefix -> (tee head, pipe prefix, elbow head, space prefix).  Siblings
+    # share one prefix string, so each distinct prefix is extended once.
+    branches: dict[str, tuple[str, str, str, str]] = {}
+    while stack:
+        current, head, prefix = stack.pop()
+        # A single f-string builds the line in one allocation; it measured
+        # faster than "".join() over the same parts.
+        push_line(f"{head}{current.key}: {format_type(current)}")
+
+        children = current.children
+        if not children:
+            continue
+        parts = branches.get(prefix)
+        if parts is None:
+            parts = branches[prefix] = (
+                prefix + _TEE,
+                prefix + _PIPE,
+                prefix + _ELBOW,
+                prefix + _SPACE,
+            )
+        tee, pipe, elbow, space = parts
+        # Push in reverse so the first child is popped (rendered) first.
+        last = len(children) - 1
+        push((children[last], elbow, space))
+        for i in range(last - 1, -1, -1):
+            push((children[i], tee, pipe))
     return "\n".join(lines)
 
 
 def _format_type(node: SchemaNode) -> str:
     """Format the type annotation shown after the colon."""
-    # Single sequence type -- e.g. list[int], tuple[str]
-    if len(node.types) == 1 and node.types[0] in _SEQUENCE_TYPES:
-        seq_type = node.types[0]
-        if node.element_type:
-            return f"{seq_type}[{node.element_type}]"
-        return seq_type
-    # Plain dict
-    if node.types == ["dict"]:
-        return "dict"
-    # Single non-sequence type -- e.g. int, str, bool
+    # Single type -- by far the most common case.  Only sequences with a
+    # known element type need formatting (e.g. list[int], tuple[str]);
+    # everything else, including plain dict / list, is the bare name.
     if len(node.types) == 1:
-        return node.types[0]
+        single = node.types[0]
+        if node.element_type and single in _SEQUENCE_TYPES:
+            return f"{single}[{node.element_type}]"
+        return single
 
     # Nullable compound types – e.g. NoneType | dict, NoneType | list[int]
     non_none = [t for t in node.types if t != "NoneType"]
@@ -71,38 +102,3 @@ def _format_type(node: SchemaNode) -> str:
 
     # Multiple types – use pipe syntax (e.g. str | int)
     return " | ".join(node.types)
-
-
-def _render_node(
-    node: SchemaNode,
-    lines: list[str],
-    *,
-    prefix: str,
-) -> None:
-    """Render one node and its children."""
-    lines.append(f"{prefix}{node.key}: {_format_type(node)}")
-
-    if node.children:
-        _render_children(node.children, lines, prefix=prefix)
-
-
-def _render_children(
-    children: list[SchemaNode],
-    lines: list[str],
-    *,
-    prefix: str,
-) -> None:
-    """Render child nodes with box-drawing connectors.
-
-    Appends formatted lines to *lines* in place.
-    """
-    for i, child in enumerate(children):
-        is_last = i == len(children) - 1
-        connector = _ELBOW if is_last else _TEE
-        child_prefix = prefix + (_SPACE if is_last else _PIPE)
-
-        child_line = f"{prefix}{connector}{child.key}: {_format_type(child)}"
-        lines.append(child_line)
-
-        if child.children:
-            _render_children(child.children, lines, prefix=child_prefix)
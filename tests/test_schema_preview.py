@@ -4,17 +4,25 @@ from __future__ import annotations
 
 import json
 import shutil
+import subprocess
 import sys
 import textwrap
 import warnings
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, redirect_stdout
 from io import StringIO
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 
 import pytest
 
-from schema_preview import preview, schema_of
+from schema_preview import _loader, preview, schema_of
 from schema_preview._cli import main as cli_main
-from schema_preview._schema import infer_schema
+from schema_preview._loader import load_path
+from schema_preview._schema import SchemaNode, infer_schema
+from schema_preview._tree import render
 
 
 def _get_uv_path() -> str:
@@ -32,6 +40,21 @@ def _get_uv_path() -> str:
     return uv_path
 
 
+@contextmanager
+def _cli_io(argv: list[str], stdin_data: str | None) -> Iterator[StringIO]:
+    """Swap in *argv* / *stdin_data* and capture stdout for one CLI run."""
+    old_argv, old_stdin = sys.argv, sys.stdin
+    sys.argv = argv
+    if stdin_data is not None:
+        sys.stdin = StringIO(stdin_data)
+    stdout = StringIO()
+    try:
+        with redirect_stdout(stdout):
+            yield stdout
+    finally:
+        sys.argv, sys.stdin = old_argv, old_stdin
+
+
 def _run_cli_direct(
     file_path: str | None = None,
     stdin_data: str | None = None,
@@ -53,32 +76,59 @@ def _run_cli_direct(
     str
         Captured stdout output.
     """
-    old_stdout = sys.stdout
-    old_argv = sys.argv
-    old_stdin = sys.stdin
-    stdout_capture = StringIO()
-    try:
-        sys.stdout = stdout_capture
-        if stdin_data is not None:
-            sys.stdin = StringIO(stdin_data)
-
-        argv = ["schema-preview"]
-        if file_path:
-            argv.append(file_path)
-        if extra_args:
-            argv.extend(extra_args)
-        sys.argv = argv
-
-        cli_main()
-    except SystemExit:
-        pass
-    finally:
-        output = stdout_capture.getvalue()
-        sys.stdout = old_stdout
-        sys.stdin = old_stdin
-        sys.argv = old_argv
+    argv = ["schema-preview"]
+    if file_path:
+        argv.append(file_path)
+    if extra_args:
+        argv.extend(extra_args)
 
-    return output
+    with _cli_io(argv, stdin_data) as stdout:
+        try:
+            cli_main()
+        except SystemExit:
+            pass
+    return stdout.getvalue()
+
+
+# ── expected output ────────────────────────────────────────────────
+
+_EXPECTED_FULL = textwrap.dedent("""\
+    root: dict
+    ├── user_id: int
+    ├── profile: dict
+    │   ├── nickname: str
+    │   └── settings: dict
+    │       ├── dark_mode: bool
+    │       └── notifications: list[int]
+    └── history: list[dict]
+        ├── action: str
+        └── timestamp: int""")
+
+_EXPECTED_LIST_OF_DICTS = textwrap.dedent("""\
+    root: list[dict]
+    ├── action: str
+    ├── timestamp: int
+    ├── result: NoneType | int
+    └── number: list[int]""")
+
+
+@pytest.fixture(scope="session")
+def showcase_data() -> dict[str, Any]:
+    """Fixture providing the README showcase dict (session-scoped)."""
+    return {
+        "user_id": 123,
+        "profile": {
+            "nickname": "Archer",
+            "settings": {
+                "dark_mode": True,
+                "notifications": [1, 2, 3],
+            },
+        },
+        "history": [
+            {"action": "login", "timestamp": 167890123},
+            {"action": "login", "timestamp": 167890123},
+        ],
+    }
 
 
 # ── basic rendering ────────────────────────────────────────────────
@@ -93,36 +143,21 @@ class TestPreview:
         assert "a: int" in captured.out
         assert "b: str" in captured.out
 
+    def test_full_example(
+        self,
+        showcase_data: dict[str, Any],
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        """preview() prints exactly what schema_of() returns."""
+        preview(showcase_data)
+        captured = capsys.readouterr()
+        assert captured.out == _EXPECTED_FULL + "\n"
+
 
 class TestSchemaOf:
-    def test_full_example(self) -> None:
+    def test_full_example(self, showcase_data: dict[str, Any]) -> None:
         """The showcase example from the README."""
-        my_dict = {
-            "user_id": 123,
-            "profile": {
-                "nickname": "Archer",
-                "settings": {
-                    "dark_mode": True,
-                    "notifications": [1, 2, 3],
-                },
-            },
-            "history": [
-                {"action": "login", "timestamp": 167890123},
-                {"action": "login", "timestamp": 167890123},
-            ],
-        }
-        expected = textwrap.dedent("""\
-            root: dict
-            ├── user_id: int
-            ├── profile: dict
-            │   ├── nickname: str
-            │   └── settings: dict
-            │       ├── dark_mode: bool
-            │       └── notifications: list[int]
-            └── history: list[dict]
-                ├── action: str
-                └── timestamp: int""")
-        assert schema_of(my_dict) == expected
+        assert schema_of(showcase_data) == _EXPECTED_FULL
 
     def test_flat_dict(self) -> None:
         data = {"a": 1, "b": "hello", "c": 3.14}
@@ -165,8 +200,23 @@ class TestListInference:
             result = schema_of(data)
             assert len(w) == 1
             assert "mixed types" in str(w[0].message)
+            assert w[0].filename == __file__
         assert "vals: list" in result
 
+    def test_mixed_types_single_summary_warning(self) -> None:
+        """Many mixed lists produce one summarising warning."""
+        data = {f"k{i}": [1, "x"] for i in range(7)}
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            infer_schema(data)
+        assert len(w) == 1
+        message = str(w[0].message)
+        assert message.startswith("7 lists with mixed types: ")
+        assert "Key 'k0'" in message
+        assert "Key 'k5'" not in message
+        assert message.endswith("; and 2 more")
+        assert w[0].filename == __file__
+
 
 # ── merged dict keys ──────────────────────────────────────────────
 
@@ -197,6 +247,22 @@ class TestMergedDictKeys:
         result = schema_of(data)
         assert "k: int" in result
 
+    def test_same_keys_different_types(self) -> None:
+        """Records sharing a key layout still merge per-key types."""
+        data = [{"a": 1, "b": {"x": 1}}, {"a": "s", "b": {"y": 2}}]
+        assert schema_of(data) == textwrap.dedent("""\
+            root: list[dict]
+            ├── a: int | str
+            └── b: dict
+                ├── x: int
+                └── y: int""")
+
+    def test_same_keys_different_order(self) -> None:
+        data = [{"a": 1, "b": "s"}, {"b": None, "a": 2}]
+        node = infer_schema(data)
+        assert [c.key for c in node.children] == ["a", "b"]
+        assert node.children[1].types == ["NoneType", "str"]
+
 
 # ── nullable compound types ───────────────────────────────────────
 
@@ -281,17 +347,39 @@ class TestNullableCompoundTypes:
 class TestMaxItems:
     def test_samples_limited_elements(self) -> None:
         """With max_items=2, only first 2 elements are inspected."""
-        data = {"nums": list(range(10_000))}
+        data = {"nums": range(10_000)}
         node = infer_schema(data, max_items=2)
         # Should still correctly infer int
         child = node.children[0]
         assert child.element_type == "int"
 
+    def test_mixed_after_sample_is_ignored(self) -> None:
+        """Elements past max_items never affect the element type."""
+        node = infer_schema([1, 2, "x"], max_items=2)
+        assert node.element_type == "int"
+
+    def test_zero_max_items(self) -> None:
+        node = infer_schema([1, 2], max_items=0)
+        assert node.types == ["list"]
+        assert node.element_type is None
+
+    @pytest.mark.parametrize("file", [None, "events.jsonl"])
+    def test_negative_max_items_rejected(
+        self, file: str | None, data_dir: Path
+    ) -> None:
+        """Rejected up front, before a file is read."""
+        data = {"a": [1, 2, 3]} if file is None else str(data_dir / file)
+        with pytest.raises(ValueError, match="max_items must be >= 0"):
+            schema_of(data, max_items=-1)
+
     def test_large_list_performance(self) -> None:
         """Ensure a huge list doesn't blow up."""
-        data = {"big": list(range(1_000_000))}
-        result = schema_of(data, max_items=5)
-        assert "big: list[int]" in result
+        data = {"big": range(1_000_000)}
+        node = infer_schema(data, max_items=5)
+        child = node.children[0]
+        assert child.key == "big"
+        assert child.types == ["range"]
+        assert child.element_type == "int"
 
 
 # ── schema node structure ─────────────────────────────────────────
@@ -311,6 +399,30 @@ class TestSchemaNode:
         assert node.children[0].key == "a"
         assert node.children[1].key == "b"
 
+    def test_editing_types_does_not_leak(self) -> None:
+        """Mutating one node's types never affects later inference."""
+        infer_schema({"a": 1}).children[0].types.append("str")
+        assert schema_of({"b": 2}) == "root: dict\n└── b: int"
+
+    def test_node_uses_slots(self) -> None:
+        node = infer_schema({"a": 1})
+        assert not hasattr(node, "__dict__")
+
+    def test_render_after_node_changes(self) -> None:
+        """Editing a node after rendering must not show the stale type."""
+        node = infer_schema({"xs": [1, 2], "d": {"a": None}})
+        render(node)
+        xs, d = node.children
+        xs.types = ["tuple"]
+        xs.element_type = "str"
+        d.children[0].types = ["NoneType", "int"]
+        assert render(node) == (
+            "root: dict\n"
+            "├── xs: tuple[str]\n"
+            "└── d: dict\n"
+            "    └── a: NoneType | int"
+        )
+
 
 # ── deeply nested ─────────────────────────────────────────────────
 
@@ -329,40 +441,105 @@ class TestDeepNesting:
         assert "level2: dict" in result
         assert "level3: str" in result
 
+    def test_infer_beyond_recursion_limit(self) -> None:
+        """Inference on very deep input must not raise RecursionError."""
+        depth = sys.getrecursionlimit() + 100
+        data: dict[str, Any] = {}
+        inner = data
+        for _ in range(depth):
+            inner["next"] = [{}]
+            inner = inner["next"][0]
+        node = infer_schema(data)
+        for _ in range(depth):
+            (node,) = node.children
+            assert node.key == "next"
+            assert node.element_type == "dict"
+        assert node.children == []
+
+    @pytest.mark.parametrize(
+        "make",
+        [
+            lambda d: d.__setitem__("self", d),
+            lambda d: d.__setitem__("rows", [d]),
+            lambda d: d.__setitem__("rows", [{"up": [d]}, {"up": None}]),
+        ],
+        ids=["dict", "list", "merged"],
+    )
+    def test_self_referential_raises(
+        self, make: Callable[[dict[str, Any]], None]
+    ) -> None:
+        """Cyclic input fails fast instead of looping forever."""
+        data: dict[str, Any] = {}
+        make(data)
+        with pytest.raises(ValueError, match="self-referential"):
+            infer_schema(data)
+
+    def test_shared_sibling_is_not_a_cycle(self) -> None:
+        """The same object may appear more than once side by side."""
+        shared = {"id": 1}
+        data = {"a": shared, "b": shared, "rows": [shared, shared]}
+        result = schema_of(data)
+        assert "b: dict" in result
+        assert "rows: list[dict]" in result
+
+    def test_record_nested_in_sibling_is_not_a_cycle(self) -> None:
+        """A record may also appear inside a sibling record."""
+        r: dict[str, Any] = {"x": {}}
+        assert schema_of([{"x": r}, r]) == textwrap.dedent("""\
+            root: list[dict]
+            └── x: dict
+                └── x: dict""")
+
+    def test_record_in_sibling_list_is_not_a_cycle(self) -> None:
+        """Same, reached through the flattened list values."""
+        r: dict[str, Any] = {"a": []}
+        assert schema_of([{"a": [r]}, r]) == textwrap.dedent("""\
+            root: list[dict]
+            └── a: list[dict]
+                └── a: list""")
+
+    def test_cycle_inside_merged_records_raises(self) -> None:
+        """A cycle that skips the root is still found."""
+        a: dict[str, Any] = {}
+        a["x"] = {"y": a}
+        with pytest.raises(ValueError, match="self-referential"):
+            infer_schema({"rows": [a, {}]})
+
+    def test_render_beyond_recursion_limit(self) -> None:
+        """Rendering deep trees must not raise RecursionError."""
+        depth = sys.getrecursionlimit() + 100
+        root = SchemaNode(key="root", types=["dict"])
+        node = root
+        for i in range(depth):
+            child = SchemaNode(key=f"k{i}", types=["dict"])
+            node.children.append(child)
+            node = child
+        lines = render(root).splitlines()
+        assert len(lines) == depth + 1
+        assert lines[-1].endswith(f"└── k{depth - 1}: dict")
+
 
 # ── CLI ───────────────────────────────────────────────────────────
 
 
-@pytest.fixture(scope="class")
+@pytest.fixture(scope="session")
 def data_dir() -> Path:
-    """Fixture providing test data directory (class-scoped)."""
+    """Fixture providing test data directory (session-scoped)."""
     return Path(__file__).parent / "data"
 
 
 class TestCLI:
-    def test_dict_file_subprocess(self, data_dir: Path) -> None:
-        """Integration test: verify CLI works via subprocess."""
-        import subprocess
-
-        result = subprocess.run(
-            [
-                _get_uv_path(),
-                "run",
-                "schema-preview",
-                str(data_dir / "dict.json"),
-            ],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode == 0
+    def test_dict_file(self, data_dir: Path) -> None:
+        """Fast test: verify dict file parsing via direct function call."""
+        output = _run_cli_direct(str(data_dir / "dict.json"))
         # Check top-level keys
-        assert "id: int" in result.stdout
-        assert "dateTime: str" in result.stdout
-        assert "squadHome: dict" in result.stdout
-        assert "squadAway: dict" in result.stdout
+        assert "id: int" in output
+        assert "dateTime: str" in output
+        assert "squadHome: dict" in output
+        assert "squadAway: dict" in output
         # Check nested structure
-        assert "players: list[dict]" in result.stdout
-        assert "substitutions: list[dict]" in result.stdout
+        assert "players: list[dict]" in output
+        assert "substitutions: list[dict]" in output
 
     def test_list_file(self, data_dir: Path) -> None:
         """Fast test: verify list file parsing via direct function call."""
@@ -402,10 +579,60 @@ class TestCLI:
         assert "player: str" in output
         assert "team_id: int" in output
 
-    def test_jsonl_file_subprocess(self, data_dir: Path) -> None:
-        """Integration test: verify JSONL via subprocess."""
-        import subprocess
+    def test_jsonl_stdin(self) -> None:
+        """Fast test: verify --jsonl flag with stdin."""
+        lines = '{"a": 1, "b": "x"}\n{"a": 2, "b": "y"}\n'
+        output = _run_cli_direct(
+            stdin_data=lines,
+            extra_args=["--jsonl"],
+        )
+        assert "root: list[dict]" in output
+        assert "a: int" in output
+        assert "b: str" in output
+
+    def test_stdin_non_strict_json(self) -> None:
+        """Input accepted by the stdlib decoder (NaN, huge ints) works."""
+        data = '{"x": NaN, "n": 123456789012345678901234567890}'
+        output = _run_cli_direct(stdin_data=data)
+        assert "x: float" in output
+        assert "n: int" in output
+
+    def test_stdin_orjson_fallback(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Input orjson rejects is handed to the stdlib decoder."""
+        calls: list[str] = []
+
+        def reject(text: str) -> Any:
+            calls.append(text)
+            raise ValueError("unsupported")
 
+        monkeypatch.setattr(_loader, "_orjson", SimpleNamespace(loads=reject))
+        data = '{"x": NaN, "n": 123456789012345678901234567890}'
+        output = _run_cli_direct(stdin_data=data)
+        assert calls == [data]
+        assert output == "root: dict\n├── x: float\n└── n: int\n"
+
+    def test_negative_max_items_rejected(
+        self, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        argv = ["schema-preview", "--max-items", "-1"]
+        with _cli_io(argv, '{"a": [1, 2, 3]}'), pytest.raises(SystemExit):
+            cli_main()
+        assert "--max-items must be >= 0" in capsys.readouterr().err
+
+    def test_jsonl_stdin_stops_after_max_items(self) -> None:
+        """Records past --max-items are never parsed."""
+        lines = '{"a": 1}\n{"a": 2}\nnot json\n'
+        output = _run_cli_direct(
+            stdin_data=lines,
+            extra_args=["--jsonl", "--max-items", "2"],
+        )
+        assert "a: int" in output
+
+    @pytest.mark.slow
+    def test_cli_entrypoint_subprocess(self, data_dir: Path) -> None:
+        """Integration test: the console script is wired up correctly."""
         result = subprocess.run(
             [
                 _get_uv_path(),
@@ -419,18 +646,6 @@ class TestCLI:
         assert result.returncode == 0
         assert "root: list[dict]" in result.stdout
         assert "event_id: int" in result.stdout
-        assert "type: str" in result.stdout
-
-    def test_jsonl_stdin(self) -> None:
-        """Fast test: verify --jsonl flag with stdin."""
-        lines = '{"a": 1, "b": "x"}\n{"a": 2, "b": "y"}\n'
-        output = _run_cli_direct(
-            stdin_data=lines,
-            extra_args=["--jsonl"],
-        )
-        assert "root: list[dict]" in output
-        assert "a: int" in output
-        assert "b: str" in output
 
     def test_file_not_found(self) -> None:
         """CLI raises FileNotFoundError for missing files."""
@@ -474,6 +689,19 @@ class TestEdgeCases:
         assert "b: int" in result
         assert "c: int" in result
 
+    def test_container_subclasses(self) -> None:
+        """Subclasses of dict / list are still expanded."""
+
+        class IntList(list[int]):
+            pass
+
+        node = infer_schema(OrderedDict(xs=IntList([1, 2]), d={"a": 1}))
+        assert node.types == ["dict"]
+        xs, d = node.children
+        assert xs.types == ["IntList"]
+        assert xs.element_type == "int"
+        assert d.children[0].key == "a"
+
 
 # ── top-level iterables ───────────────────────────────────────────
 
@@ -498,14 +726,11 @@ class TestTopLevelIterables:
             {"action": "login", "result": None},
             {"action": "login", "result": 1, "number": [1, 2, 3]},
         ]
-        result = schema_of(data)
-        expected = textwrap.dedent("""\
-            root: list[dict]
-            ├── action: str
-            ├── timestamp: int
-            ├── result: NoneType | int
-            └── number: list[int]""")
-        assert result == expected
+        assert schema_of(data) == _EXPECTED_LIST_OF_DICTS
+
+    def test_range(self) -> None:
+        result = schema_of(range(3))
+        assert result == "root: range[int]"
 
     def test_empty_list(self) -> None:
         result = schema_of([])
@@ -529,21 +754,21 @@ class TestTopLevelIterables:
 
 # ── file path support ──────────────────────────────────────────────
 
+_AsPath = Callable[[Path], Path | str]
+
+# Run a test once with a ``pathlib.Path`` and once with a plain string.
+_PATH_KINDS = pytest.mark.parametrize(
+    "as_path", [Path, str], ids=["Path", "str"]
+)
+
 
 class TestFilePath:
     """Test that preview() and schema_of() accept file paths."""
 
-    def test_path_object(self, data_dir: Path) -> None:
-        """Path objects are loaded and parsed as JSON."""
-        path = data_dir / "dict.json"
-        result = schema_of(path)
-        assert "id: int" in result
-        assert "squadHome: dict" in result
-
-    def test_path_string(self, data_dir: Path) -> None:
-        """String paths to existing files are loaded."""
-        path_str = str(data_dir / "dict.json")
-        result = schema_of(path_str)
+    @_PATH_KINDS
+    def test_path(self, data_dir: Path, as_path: _AsPath) -> None:
+        """Path objects and string paths are loaded and parsed as JSON."""
+        result = schema_of(as_path(data_dir / "dict.json"))
         assert "id: int" in result
         assert "squadHome: dict" in result
 
@@ -554,41 +779,33 @@ class TestFilePath:
         assert "root: list[dict]" in result
         assert "team_id: int" in result
 
-    def test_path_object_jsonl(self, data_dir: Path) -> None:
-        """Path to a JSONL file is loaded as list of objects."""
-        path = data_dir / "events.jsonl"
-        result = schema_of(path)
+    @_PATH_KINDS
+    def test_path_jsonl(self, data_dir: Path, as_path: _AsPath) -> None:
+        """Paths to JSONL files are loaded as lists of objects."""
+        result = schema_of(as_path(data_dir / "events.jsonl"))
         assert "root: list[dict]" in result
         assert "event_id: int" in result
         assert "type: str" in result
         assert "minute: int" in result
 
-    def test_path_string_jsonl(self, data_dir: Path) -> None:
-        """String paths to .jsonl files are loaded."""
-        path_str = str(data_dir / "events.jsonl")
-        result = schema_of(path_str)
-        assert "root: list[dict]" in result
-        assert "event_id: int" in result
+    def test_jsonl_reads_only_sampled_records(self, tmp_path: Path) -> None:
+        """Only the first *max_items* JSONL records are loaded."""
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"a": 1}\n\n{"a": null}\n{"b": 2}\nnot json\n')
+        assert load_path(path, max_items=2) == [{"a": 1}, {"a": None}]
+        result = schema_of(path, max_items=3)
+        assert "a: NoneType | int" in result
+        assert "b: int" in result
 
+    @_PATH_KINDS
     def test_preview_with_path(
         self,
         data_dir: Path,
+        as_path: _AsPath,
         capsys: pytest.CaptureFixture[str],
     ) -> None:
-        """preview() works with Path objects."""
-        path = data_dir / "dict.json"
-        preview(path)
-        captured = capsys.readouterr()
-        assert "id: int" in captured.out
-
-    def test_preview_with_string_path(
-        self,
-        data_dir: Path,
-        capsys: pytest.CaptureFixture[str],
-    ) -> None:
-        """preview() works with string paths."""
-        path_str = str(data_dir / "dict.json")
-        preview(path_str)
+        """preview() works with Path objects and string paths."""
+        preview(as_path(data_dir / "dict.json"))
         captured = capsys.readouterr()
         assert "id: int" in captured.out
 
@@ -609,14 +826,10 @@ class TestFilePath:
         result = schema_of("hello")
         assert result == "root: str"
 
-    def test_relative_string_path(self, data_dir: Path) -> None:
+    def test_relative_string_path(
+        self, data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Relative string paths work when they resolve."""
-        import os
-
-        old_cwd = os.getcwd()
-        try:
-            os.chdir(data_dir.parent.parent)
-            result = schema_of("tests/data/dict.json")
-            assert "id: int" in result
-        finally:
-            os.chdir(old_cwd)
+        monkeypatch.chdir(data_dir.parent.parent)
+        result = schema_of("tests/data/dict.json")
+        assert "id: int" in result